@@ -1,14 +1,73 @@
 from __future__ import annotations
 
-import re
-from datetime import datetime, timedelta, timezone
+import functools
+import threading
+import time
+from datetime import timedelta, timezone
 from typing import Any
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from googleapiclient.discovery import build
+import httplib2
+from ciso8601 import parse_datetime
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import Resource, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
 
 from app.google_auth import get_google_credentials
 
+GOOGLE_API_TIMEOUT_SECONDS = 15
+PAST_START_TOLERANCE_SECONDS = 120
+# Google Calendar accepts at most 50 calls per batch request.
+CALENDAR_BATCH_LIMIT = 50
+
+# httplib2 connections are not thread-safe, so each worker thread keeps its own services.
+_SERVICE_STATE = threading.local()
+
+_WORD_HOURS = {
+    "zero": 0,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "thirteen": 13,
+    "fourteen": 14,
+}
+
+_COMMON_TIMEZONE_NAMES = (
+    "Etc/UTC",
+    "Europe/Berlin",
+    "Europe/London",
+    "America/New_York",
+    "America/Los_Angeles",
+    "Asia/Tokyo",
+    "Asia/Kolkata",
+    "Australia/Sydney",
+)
+
+
+def _load_common_timezones() -> dict[str, timezone | ZoneInfo]:
+    zones: dict[str, timezone | ZoneInfo] = {"UTC": timezone.utc}
+    for name in _COMMON_TIMEZONE_NAMES:
+        try:
+            zones[name] = ZoneInfo(name)
+        except ZoneInfoNotFoundError:
+            continue
+    return zones
+
+
+_COMMON_TZ = _load_common_timezones()
+
 
 def validate_event_payload(payload: dict[str, Any]) -> dict[str, Any]:
     meeting_with_name = str(
@@ -37,16 +96,14 @@ def validate_event_payload(payload: dict[str, Any]) -> dict[str, Any]:
         raise ValueError("duration_minutes must be between 5 and 240.")
 
     try:
-        start_dt = datetime.fromisoformat(start_time_iso.replace("Z", "+00:00"))
+        start_dt = parse_datetime(start_time_iso)
     except ValueError as exc:
         raise ValueError("start_time_iso must be a valid ISO-8601 datetime.") from exc
 
     if start_dt.tzinfo is None:
         start_dt = start_dt.replace(tzinfo=timezone_info)
 
-    now_utc = datetime.now(timezone.utc)
-    start_utc = start_dt.astimezone(timezone.utc)
-    if start_utc < now_utc - timedelta(minutes=2):
+    if start_dt.timestamp() < time.time() - PAST_START_TOLERANCE_SECONDS:
         raise ValueError("Meeting time is in the past. Please provide a future date and time.")
 
     summary = meeting_title or f"Meeting with {meeting_with_name}"
@@ -60,74 +117,117 @@ def validate_event_payload(payload: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=512)
+def _zoneinfo_cached(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+@functools.lru_cache(maxsize=2880)
+def _fixed_offset(minutes: int) -> timezone:
+    return timezone(timedelta(minutes=minutes))
+
+
+def _parse_utc_offset(value: str) -> timezone | None:
+    # Accepts "[utc|gmt]+H", "+HH", "+HMM", "+HHMM", "+H:MM", "+HH:MM" and, with a
+    # utc/gmt prefix, spelled-out hours like "utc+one".
+    has_prefix = value.startswith(("utc", "gmt"))
+    rest = value[3:] if has_prefix else value
+    if not rest or rest[0] not in "+-":
+        return None
+    sign = -1 if rest[0] == "-" else 1
+    tail = rest[1:]
+
+    if has_prefix:
+        word_hour = _WORD_HOURS.get(tail)
+        if word_hour is not None:
+            return _fixed_offset(sign * word_hour * 60)
+
+    hour_part, colon, minute_part = tail.partition(":")
+    if not hour_part.isdecimal() or (minute_part and not minute_part.isdecimal()):
+        return None
+    if colon:
+        if len(hour_part) > 2 or len(minute_part) != 2:
+            return None
+    elif len(hour_part) > 2:
+        if len(hour_part) > 4:
+            return None
+        hour_part, minute_part = hour_part[:-2], hour_part[-2:]
+
+    hour = int(hour_part)
+    minute = int(minute_part or "0")
+    if hour > 14 or minute > 59:
+        return None
+    return _fixed_offset(sign * (hour * 60 + minute))
+
+
 def parse_timezone(value: str | None) -> tuple[str | None, timezone | ZoneInfo | None]:
     if not value:
         return None, None
 
+    hit = _COMMON_TZ.get(value)
+    if hit is not None:
+        return value, hit
+
     raw_value = value.strip()
     if raw_value.upper() == "UTC":
         return "UTC", timezone.utc
 
     try:
-        zone = ZoneInfo(raw_value)
+        zone = _zoneinfo_cached(raw_value)
         return raw_value, zone
     except ZoneInfoNotFoundError:
         pass
 
-    normalized = raw_value.lower().strip()
-    normalized = normalized.replace("utc plus", "utc+").replace("utc minus", "utc-")
-    normalized = normalized.replace("gmt plus", "gmt+").replace("gmt minus", "gmt-")
+    # Anything that is not an IANA name must look like an offset to be worth normalizing.
+    normalized = raw_value.lower()
+    prefix = normalized[:3]
+    if prefix in ("utc", "gmt"):
+        tail = normalized[3:]
+        if tail.startswith(" plus"):
+            normalized = f"{prefix}+{tail[5:]}"
+        elif tail.startswith(" minus"):
+            normalized = f"{prefix}-{tail[6:]}"
+    elif not normalized.startswith(("+", "-")):
+        return None, None
     normalized = normalized.replace(" ", "")
 
-    word_hours = {
-        "zero": 0,
-        "one": 1,
-        "two": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9,
-        "ten": 10,
-        "eleven": 11,
-        "twelve": 12,
-        "thirteen": 13,
-        "fourteen": 14,
-    }
+    return None, _parse_utc_offset(normalized)
 
-    word_match = re.match(r"^(?:utc|gmt)([+-])(zero|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen)$", normalized)
-    if word_match:
-        sign = word_match.group(1)
-        hour = word_hours[word_match.group(2)]
-        delta = timedelta(hours=hour)
-        if sign == "-":
-            delta = -delta
-        return None, timezone(delta)
-
-    numeric_match = re.match(r"^(?:(?:utc|gmt))?([+-])(\d{1,2})(?::?(\d{2}))?$", normalized)
-    if numeric_match:
-        sign = numeric_match.group(1)
-        hour = int(numeric_match.group(2))
-        minute = int(numeric_match.group(3) or "0")
-        if hour > 14 or minute > 59:
-            return None, None
-        delta = timedelta(hours=hour, minutes=minute)
-        if sign == "-":
-            delta = -delta
-        return None, timezone(delta)
-
-    return None, None
 
+@functools.lru_cache(maxsize=4)
+def _discovery_document(api: str, version: str) -> str:
+    document = get_static_doc(api, version)
+    if document is None:
+        raise RuntimeError(f"Discovery document for {api} {version} is not available.")
+    return document
 
-def create_calendar_event(payload: dict[str, Any]) -> dict[str, Any]:
-    event_input = validate_event_payload(payload)
-    end_dt = event_input["start_dt"] + timedelta(minutes=event_input["duration_minutes"])
 
-    credentials = get_google_credentials()
-    calendar = build("calendar", "v3", credentials=credentials)
+def _service_cache() -> dict[str, Resource]:
+    cache = getattr(_SERVICE_STATE, "services", None)
+    if cache is None:
+        cache = _SERVICE_STATE.services = {}
+    return cache
+
 
+def _get_calendar_service(credentials: Credentials) -> Resource:
+    cache = _service_cache()
+    service = cache.get(credentials.token)
+    if service is None:
+        # A dedicated keep-alive transport per service lets later bookings reuse the TLS connection.
+        http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=GOOGLE_API_TIMEOUT_SECONDS))
+        service = build_from_document(_discovery_document("calendar", "v3"), http=http)
+        # Tokens rotate on refresh; keep only the service for the current one.
+        cache.clear()
+        cache[credentials.token] = service
+    return service
+
+
+def _evict_calendar_service(credentials: Credentials) -> None:
+    _service_cache().pop(credentials.token, None)
+
+
+def _build_event(event_input: dict[str, Any]) -> dict[str, Any]:
+    end_dt = event_input["start_dt"] + timedelta(minutes=event_input["duration_minutes"])
     event = {
         "summary": event_input["summary"],
         "description": f"Booked by voice assistant. Meeting with {event_input['meeting_with_name']}.",
@@ -141,13 +241,12 @@ def create_calendar_event(payload: dict[str, Any]) -> dict[str, Any]:
     if event_input["timezone"]:
         event["start"]["timeZone"] = event_input["timezone"]
         event["end"]["timeZone"] = event_input["timezone"]
+    return event
 
-    created = (
-        calendar.events()
-        .insert(calendarId="primary", body=event)
-        .execute()
-    )
 
+def _event_result(
+    event_input: dict[str, Any], event: dict[str, Any], created: dict[str, Any]
+) -> dict[str, Any]:
     return {
         "ok": True,
         "eventId": created.get("id", ""),
@@ -156,3 +255,82 @@ def create_calendar_event(payload: dict[str, Any]) -> dict[str, Any]:
         "startsAt": event["start"]["dateTime"],
         "endsAt": event["end"]["dateTime"],
     }
+
+
+def _is_auth_failure(exc: Exception) -> bool:
+    return isinstance(exc, RefreshError) or (isinstance(exc, HttpError) and exc.resp.status == 401)
+
+
+def create_calendar_event(payload: dict[str, Any]) -> dict[str, Any]:
+    event_input = validate_event_payload(payload)
+    event = _build_event(event_input)
+
+    credentials = get_google_credentials()
+
+    try:
+        calendar = _get_calendar_service(credentials)
+        created = (
+            calendar.events()
+            .insert(calendarId="primary", body=event)
+            .execute()
+        )
+    except (RefreshError, HttpError) as exc:
+        if _is_auth_failure(exc):
+            _evict_calendar_service(credentials)
+        raise
+
+    return _event_result(event_input, event, created)
+
+
+def create_calendar_events(payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # All payloads are validated up front so a bad entry books nothing.
+    event_inputs = []
+    for index, payload in enumerate(payloads):
+        try:
+            event_inputs.append(validate_event_payload(payload))
+        except ValueError as exc:
+            raise ValueError(f"payloads[{index}]: {exc}") from exc
+    events = [_build_event(event_input) for event_input in event_inputs]
+    if not events:
+        return []
+
+    credentials = get_google_credentials()
+    responses: dict[str, dict[str, Any]] = {}
+    errors: dict[str, Exception] = {}
+
+    def collect(request_id: str, response: dict[str, Any], exception: Exception | None) -> None:
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            responses[request_id] = response
+
+    for offset in range(0, len(events), CALENDAR_BATCH_LIMIT):
+        chunk_end = min(offset + CALENDAR_BATCH_LIMIT, len(events))
+        request_ids = [str(index) for index in range(offset, chunk_end)]
+        try:
+            calendar = _get_calendar_service(credentials)
+            batch = calendar.new_batch_http_request(callback=collect)
+            for request_id in request_ids:
+                batch.add(
+                    calendar.events().insert(calendarId="primary", body=events[int(request_id)]),
+                    request_id=request_id,
+                )
+            batch.execute()
+        except Exception as exc:
+            # Earlier chunks may already be booked, so record this chunk's failure and keep going.
+            for request_id in request_ids:
+                if request_id not in responses:
+                    errors.setdefault(request_id, exc)
+
+        if any(_is_auth_failure(errors[request_id]) for request_id in request_ids if request_id in errors):
+            _evict_calendar_service(credentials)
+
+    results = []
+    for index, (event_input, event) in enumerate(zip(event_inputs, events)):
+        request_id = str(index)
+        if request_id in responses:
+            results.append(_event_result(event_input, event, responses[request_id]))
+        else:
+            error = errors.get(request_id, "No response received from Google Calendar.")
+            results.append({"ok": False, "error": str(error)})
+    return results
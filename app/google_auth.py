@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-import json
+import functools
 import secrets
+import time
+from pathlib import Path
 from typing import Any
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
+import orjson
+import requests
 from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2.credentials import Credentials
+from requests.adapters import HTTPAdapter
 
 from app.config import google_credentials_path, settings
 from app.token_store import load_google_tokens, save_google_tokens
@@ -15,14 +19,26 @@ from app.token_store import load_google_tokens, save_google_tokens
 CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+OAUTH_STATE_TTL_SECONDS = 600
+OAUTH_STATE_LIMIT = 8
+
+_TOKEN_SESSION = requests.Session()
+_TOKEN_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 
 def _load_google_client_from_file() -> tuple[str, str] | None:
     path = google_credentials_path()
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
         return None
+    return _load_google_client_cached(str(path), mtime_ns)
+
 
-    payload = json.loads(path.read_text(encoding="utf-8"))
+@functools.lru_cache(maxsize=4)
+def _load_google_client_cached(path_str: str, mtime_ns: int) -> tuple[str, str] | None:
+    # mtime_ns is part of the cache key so an edited credentials file is re-read.
+    payload = orjson.loads(Path(path_str).read_bytes())
     root = payload.get("web") or payload.get("installed") or {}
     client_id = str(root.get("client_id", "")).strip()
     client_secret = str(root.get("client_secret", "")).strip()
@@ -43,15 +59,29 @@ def _google_client_config() -> tuple[str, str]:
     )
 
 
+def _remember_oauth_state(oauth_states: Any, state: str) -> dict[str, float]:
+    now = time.time()
+    if not isinstance(oauth_states, dict):
+        oauth_states = {}
+    oauth_states = {
+        key: issued_at
+        for key, issued_at in oauth_states.items()
+        if now - issued_at <= OAUTH_STATE_TTL_SECONDS
+    }
+    # Dicts keep insertion order, so the first keys are the oldest.
+    while len(oauth_states) >= OAUTH_STATE_LIMIT:
+        del oauth_states[next(iter(oauth_states))]
+    oauth_states[state] = now
+    return oauth_states
+
+
 def generate_google_auth_url(session: dict[str, Any]) -> tuple[str, str]:
     client_id, _client_secret = _google_client_config()
     state = secrets.token_urlsafe(24)
     
-    # Store state in session
-    if "oauth_states" not in session:
-        session["oauth_states"] = []
-    session["oauth_states"].append(state)
-    
+    # Store state in session, dropping expired entries and capping how many are kept.
+    session["oauth_states"] = _remember_oauth_state(session.get("oauth_states"), state)
+
     params = {
         "client_id": client_id,
         "redirect_uri": settings.google_redirect_uri,
@@ -78,13 +108,14 @@ def exchange_code_for_tokens(
 
     state_valid = False
 
-    # Primary validation: in-session state list.
+    # Primary validation: in-session state map.
     if session is not None:
-        oauth_states = session.get("oauth_states", [])
-        if state in oauth_states:
-            oauth_states.remove(state)
-            session["oauth_states"] = oauth_states
-            state_valid = True
+        oauth_states = session.get("oauth_states")
+        if isinstance(oauth_states, dict):
+            issued_at = oauth_states.pop(state, None)
+            if issued_at is not None:
+                session["oauth_states"] = oauth_states
+                state_valid = time.time() - issued_at <= OAUTH_STATE_TTL_SECONDS
 
     # Fallback validation: short-lived HTTP-only state cookie.
     if cookie_state and secrets.compare_digest(state, cookie_state):
@@ -93,23 +124,16 @@ def exchange_code_for_tokens(
     if not state_valid:
         raise RuntimeError("Invalid OAuth state.")
 
-    payload = urlencode(
-        {
-            "code": code,
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "redirect_uri": settings.google_redirect_uri,
-            "grant_type": "authorization_code",
-        }
-    ).encode("utf-8")
-    request = Request(
-        GOOGLE_TOKEN_URL,
-        data=payload,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        method="POST",
-    )
-    with urlopen(request, timeout=15) as response:
-        token_data = json.loads(response.read().decode("utf-8"))
+    payload = {
+        "code": code,
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "redirect_uri": settings.google_redirect_uri,
+        "grant_type": "authorization_code",
+    }
+    response = _TOKEN_SESSION.post(GOOGLE_TOKEN_URL, data=payload, timeout=15)
+    response.raise_for_status()
+    token_data = orjson.loads(response.content)
 
     credentials = Credentials(
         token=token_data.get("access_token"),
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
 import logging
 from uuid import uuid4
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable
 
+import orjson
 import websockets
 from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import Receive, Scope, Send
+from starlette.websockets import WebSocketClose
 from websockets.exceptions import ConnectionClosed
 
 from app.calendar_service import create_calendar_event
@@ -21,54 +25,48 @@ from app.google_auth import exchange_code_for_tokens, generate_google_auth_url,
 
 PUBLIC_DIR = Path("public")
 DEEPGRAM_WS_URL = "wss://agent.deepgram.com/v1/agent/converse"
+_IS_HTTPS = settings.base_url.startswith("https://")
 
 app = FastAPI(title="Voice Scheduling Agent")
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.session_secret_key,
     same_site="lax",
-    https_only=settings.base_url.startswith("https://"),
+    https_only=_IS_HTTPS,
 )
 app.mount("/static", StaticFiles(directory=PUBLIC_DIR), name="static")
 logger = logging.getLogger("voice_agent")
 
 
-def build_agent_settings() -> dict[str, Any]:
-    if not settings.deepgram_api_key:
-        raise RuntimeError("DEEPGRAM_API_KEY is required.")
+_PROMPT_HEADER = "You are a voice scheduling assistant. "
+_PROMPT_BODY = (
+    "Ask one short question at a time and wait for the user's answer. "
+    "Never ask multiple questions in one turn. "
+    "Never repeat a question unless the user asks you to repeat it. "
+    "Default to step-by-step collection. "
+    "Collect fields in this strict order: meeting_with_name, start date/time, timezone, optional meeting_title. "
+    "Accept natural language date/time from the user and convert it internally to start_time_iso. "
+    "Never ask the user for ISO format. "
+    "If year is omitted, infer a future date in the user's context; never pick a past year. "
+    "For relative terms like today/tomorrow/next Monday, resolve them using today's date above. "
+    "Never output start_time_iso with a year earlier than today's year unless the user explicitly requested that exact year. "
+    "Before calling create_calendar_event, ensure the interpreted start time is in the future; if not, ask one clarification question and correct it. "
+    "Do not ask for duration. Use duration_minutes=30 by default unless the user explicitly provides a different duration. "
+    "Always ask for timezone as a separate short question after collecting date/time. "
+    "Accept timezone in either IANA format (for example Europe/Berlin) or UTC offset format (for example UTC+1 or UTC plus one). "
+    "Always ask a separate optional-title question before confirmation, for example: "
+    "'Would you like to add a meeting title, or proceed without one?' "
+    "If the user declines, proceed with no title. "
+    "If the interpreted datetime could be past, ask a clarifying question before confirmation. "
+    "If details are ambiguous, ask one clarifying question. "
+    "Before booking, recap details in one sentence including the 30-minute default duration (or user-provided duration) and ask for explicit yes or no. "
+    "Call create_calendar_event only after clear yes. "
+    "Never output markdown. Never output or spell out any URL or link. "
+    "After successful booking, say one short confirmation sentence and then stop speaking."
+)
 
-    now_utc = datetime.now(timezone.utc)
-    current_date = now_utc.date().isoformat()
-    current_timestamp = now_utc.isoformat()
-
-    prompt = (
-        "You are a voice scheduling assistant. "
-        f"Today's date is {current_date}. Current UTC time is {current_timestamp}. "
-        "Ask one short question at a time and wait for the user's answer. "
-        "Never ask multiple questions in one turn. "
-        "Never repeat a question unless the user asks you to repeat it. "
-        "Default to step-by-step collection. "
-        "Collect fields in this strict order: meeting_with_name, start date/time, timezone, optional meeting_title. "
-        "Accept natural language date/time from the user and convert it internally to start_time_iso. "
-        "Never ask the user for ISO format. "
-        "If year is omitted, infer a future date in the user's context; never pick a past year. "
-        "For relative terms like today/tomorrow/next Monday, resolve them using today's date above. "
-        "Never output start_time_iso with a year earlier than today's year unless the user explicitly requested that exact year. "
-        "Before calling create_calendar_event, ensure the interpreted start time is in the future; if not, ask one clarification question and correct it. "
-        "Do not ask for duration. Use duration_minutes=30 by default unless the user explicitly provides a different duration. "
-        "Always ask for timezone as a separate short question after collecting date/time. "
-        "Accept timezone in either IANA format (for example Europe/Berlin) or UTC offset format (for example UTC+1 or UTC plus one). "
-        "Always ask a separate optional-title question before confirmation, for example: "
-        "'Would you like to add a meeting title, or proceed without one?' "
-        "If the user declines, proceed with no title. "
-        "If the interpreted datetime could be past, ask a clarifying question before confirmation. "
-        "If details are ambiguous, ask one clarifying question. "
-        "Before booking, recap details in one sentence including the 30-minute default duration (or user-provided duration) and ask for explicit yes or no. "
-        "Call create_calendar_event only after clear yes. "
-        "Never output markdown. Never output or spell out any URL or link. "
-        "After successful booking, say one short confirmation sentence and then stop speaking."
-    )
 
+def _build_agent_settings_template() -> dict[str, Any]:
     return {
         "type": "Settings",
         "flags": {"history": False},
@@ -93,7 +91,7 @@ def build_agent_settings() -> dict[str, Any]:
                     "model": "gpt-4o-mini",
                     "temperature": 0.0,
                 },
-                "prompt": prompt,
+                "prompt": _PROMPT_BODY,
                 "functions": [
                     {
                         "name": "create_calendar_event",
@@ -138,6 +136,51 @@ def build_agent_settings() -> dict[str, Any]:
     }
 
 
+_AGENT_SETTINGS_TEMPLATE = _build_agent_settings_template()
+
+
+def build_agent_settings(now_utc: datetime | None = None) -> dict[str, Any]:
+    if not settings.deepgram_api_key:
+        raise RuntimeError("DEEPGRAM_API_KEY is required.")
+
+    if now_utc is None:
+        now_utc = datetime.now(timezone.utc)
+    current_date = now_utc.date().isoformat()
+    current_timestamp = now_utc.isoformat()
+    prompt = (
+        f"{_PROMPT_HEADER}Today's date is {current_date}. "
+        f"Current UTC time is {current_timestamp}. {_PROMPT_BODY}"
+    )
+
+    # Only the prompt varies per call; the rest of the template is shared.
+    agent = _AGENT_SETTINGS_TEMPLATE["agent"]
+    return {
+        **_AGENT_SETTINGS_TEMPLATE,
+        "agent": {**agent, "think": {**agent["think"], "prompt": prompt}},
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _serialized_agent_settings(now_utc: datetime) -> str:
+    return orjson.dumps(build_agent_settings(now_utc)).decode("utf-8")
+
+
+def agent_settings_message() -> str:
+    # Truncated to the minute so connections opened within the same minute share one payload.
+    now_utc = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    return _serialized_agent_settings(now_utc)
+
+
+# Raised when one side of the voice bridge finishes so the TaskGroup cancels the other.
+class _SessionEnded(Exception):
+    pass
+
+
+async def _end_session_when_done(bridge: Awaitable[None]) -> None:
+    await bridge
+    raise _SessionEnded
+
+
 @app.get("/api/health")
 def health() -> dict[str, bool]:
     return {"ok": True}
@@ -161,7 +204,7 @@ def auth_google_start(request: Request) -> RedirectResponse:
             state,
             max_age=600,
             httponly=True,
-            secure=settings.base_url.startswith("https://"),
+            secure=_IS_HTTPS,
             samesite="lax",
             path="/",
         )
@@ -171,53 +214,34 @@ def auth_google_start(request: Request) -> RedirectResponse:
 
 
 @app.get("/auth/google/callback")
-def auth_google_callback(request: Request, code: str = Query(default=""), state: str = Query(default="")) -> RedirectResponse:
+async def auth_google_callback(request: Request, code: str = Query(default=""), state: str = Query(default="")) -> RedirectResponse:
     if not code:
         raise HTTPException(status_code=400, detail="Missing OAuth code.")
     try:
-        exchange_code_for_tokens(
+        await run_in_threadpool(
+            exchange_code_for_tokens,
             code=code,
             state=state or None,
             session=request.session,
             cookie_state=request.cookies.get("oauth_state"),
         )
         response = RedirectResponse("/?google_connected=1")
-        response.delete_cookie("oauth_state", path="/")
+        response.delete_cookie("oauth_state", path="/", secure=_IS_HTTPS, httponly=True, samesite="lax")
         return response
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Google OAuth failed: {exc}") from exc
 
 
 @app.post("/api/calendar/events")
-def calendar_events(payload: dict[str, Any]) -> dict[str, Any]:
+async def calendar_events(payload: dict[str, Any]) -> dict[str, Any]:
     try:
-        return create_calendar_event(payload)
+        return await run_in_threadpool(create_calendar_event, payload)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
-@app.get("/")
-def root() -> FileResponse:
-    return FileResponse(PUBLIC_DIR / "index.html")
-
-
-@app.get("/app.js")
-def app_js() -> FileResponse:
-    return FileResponse(PUBLIC_DIR / "app.js")
-
-
-@app.get("/audio-worklet-processor.js")
-def worklet_js() -> FileResponse:
-    return FileResponse(PUBLIC_DIR / "audio-worklet-processor.js")
-
-
-@app.get("/styles.css")
-def styles_css() -> FileResponse:
-    return FileResponse(PUBLIC_DIR / "styles.css")
-
-
 @app.websocket("/ws/voice")
 async def websocket_voice(websocket: WebSocket) -> None:
     session_id = uuid4().hex[:8]
@@ -259,23 +283,30 @@ async def websocket_voice(websocket: WebSocket) -> None:
                     return
 
             async def deepgram_to_client() -> None:
+                # Bound once: this loop runs at audio frame rate.
+                is_settings_applied = settings_applied_event.is_set
+                send_bytes = websocket.send_bytes
+                send_text = websocket.send_text
                 try:
                     async for message in deepgram_ws:
-                        if isinstance(message, bytes):
-                            if not settings_applied_event.is_set():
-                                continue
-                            await websocket.send_bytes(message)
+                        if type(message) is bytes:
+                            if is_settings_applied():
+                                await send_bytes(message)
                         else:
-                            try:
-                                parsed = json.loads(message)
-                                msg_type = parsed.get("type")
-                                if msg_type == "Welcome":
-                                    welcome_event.set()
-                                elif msg_type == "SettingsApplied":
-                                    settings_applied_event.set()
-                            except json.JSONDecodeError:
-                                pass
-                            await websocket.send_text(message)
+                            # Only the handshake frames are inspected; decode just those.
+                            if not is_settings_applied() and (
+                                "Welcome" in message or "SettingsApplied" in message
+                            ):
+                                try:
+                                    parsed = orjson.loads(message)
+                                    msg_type = parsed.get("type")
+                                    if msg_type == "Welcome":
+                                        welcome_event.set()
+                                    elif msg_type == "SettingsApplied":
+                                        settings_applied_event.set()
+                                except orjson.JSONDecodeError:
+                                    pass
+                            await send_text(message)
                 except ConnectionClosed as exc:
                     logger.warning(
                         "deepgram_closed session=%s code=%s reason=%s",
@@ -288,25 +319,19 @@ async def websocket_voice(websocket: WebSocket) -> None:
                     logger.info("client_websocket_disconnected session=%s", session_id)
                     return
 
-            task_deepgram = asyncio.create_task(deepgram_to_client())
-            await asyncio.wait_for(welcome_event.wait(), timeout=5)
-            await deepgram_ws.send(json.dumps(build_agent_settings()))
-            await asyncio.wait_for(settings_applied_event.wait(), timeout=5)
-            task_client = asyncio.create_task(client_to_deepgram())
-
-            done, pending = await asyncio.wait(
-                {task_client, task_deepgram},
-                return_when=asyncio.FIRST_COMPLETED,
-            )
-
-            for task in pending:
-                task.cancel()
-            results = await asyncio.gather(*done, *pending, return_exceptions=True)
-            for result in results:
-                if isinstance(result, (asyncio.CancelledError, WebSocketDisconnect, ConnectionClosed)):
-                    continue
-                if isinstance(result, Exception):
-                    raise result
+            try:
+                async with asyncio.TaskGroup() as task_group:
+                    task_group.create_task(_end_session_when_done(deepgram_to_client()))
+                    await asyncio.wait_for(welcome_event.wait(), timeout=5)
+                    await deepgram_ws.send(agent_settings_message())
+                    await asyncio.wait_for(settings_applied_event.wait(), timeout=5)
+                    task_group.create_task(_end_session_when_done(client_to_deepgram()))
+            except* (_SessionEnded, WebSocketDisconnect, ConnectionClosed):
+                pass
+
+            # Ending before SettingsApplied means Deepgram rejected the session; report it as a failure.
+            if not settings_applied_event.is_set():
+                raise RuntimeError("Deepgram closed before the agent settings were applied.")
     except WebSocketDisconnect:
         logger.info("voice_session_client_disconnect session=%s", session_id)
         return
@@ -315,3 +340,16 @@ async def websocket_voice(websocket: WebSocket) -> None:
         await websocket.close(code=1011, reason="Voice session failed.")
     finally:
         logger.info("voice_session_end session=%s", session_id)
+
+
+class _HTTPStaticFiles(StaticFiles):
+    # The catch-all mount also matches websocket paths; reject those like an unknown route would.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await WebSocketClose()(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Mounted last so the API, auth and websocket routes above take precedence.
+app.mount("/", _HTTPStaticFiles(directory=PUBLIC_DIR, html=True), name="root")